@@ -20,13 +20,14 @@ def extract_creation_args(func: relax.Function) -> Dict[str, Any]:
     assert isinstance(args[0], relax.ExternFunc)
     assert args[0].global_symbol == "mlc.create_paged_kv_cache_generic"
 
-    assert len(args) == 11
+    assert len(args) == 12
     assert isinstance(args[1], relax.ShapeExpr)
     assert len(args[1].values) == 5
     for i in range(2, 10):
         assert isinstance(args[i], relax.PrimValue)
         assert isinstance(args[i].value, (tvm.tir.IntImm, tvm.tir.FloatImm))
     assert isinstance(args[10], relax.DataTypeImm)
+    assert isinstance(args[11], relax.DataTypeImm)
 
     return {
         "max_batch_size": args[1].values[0],
@@ -43,6 +44,7 @@ def extract_creation_args(func: relax.Function) -> Dict[str, Any]:
         "rope_theta": args[8].value.value,
         "rotary_dim": args[9].value.value,
         "dtype": args[10].value,
+        "kv_storage_dtype": args[11].value,
     }
 
 
@@ -144,6 +146,8 @@ class DispatchKVCacheCreation:  # pylint: disable=too-many-instance-attributes
         if (  # pylint: disable=too-many-boolean-expressions
             not self.flashinfer
             or str(kwargs["dtype"]) != "float16"
+            # FlashInfer kernels read the cache in the compute dtype.
+            or str(kwargs["kv_storage_dtype"]) != str(kwargs["dtype"])
             or kwargs["head_dim"] != 128
             or (
                 kwargs["rope_mode"] == RopeMode.INLINE
@@ -0,0 +1,551 @@
+"""
+Implementation for Deepseek architecture.
+"""
+
+import dataclasses
+from typing import Any, Dict, Optional
+
+from tvm import te, tir
+from tvm.relax.frontend import nn
+from tvm.relax.frontend.nn import Tensor, op, wrap_nested
+from tvm.relax.op import strided_slice
+
+from mlc_llm import op as op_ext
+from mlc_llm.nn import PagedKVCache, RopeMode
+from mlc_llm.nn.expert import MixtralExperts
+from mlc_llm.support import logging
+from mlc_llm.support import tensor_parallel as tp
+from mlc_llm.support.config import ConfigBase
+from mlc_llm.support.style import bold
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class DeepseekConfig(ConfigBase):  # pylint: disable=too-many-instance-attributes
+    """Configuration of the Deepseek model."""
+
+    vocab_size: int
+    hidden_size: int
+    intermediate_size: int
+    moe_intermediate_size: int
+    num_hidden_layers: int
+    num_attention_heads: int
+    num_key_value_heads: int
+    n_shared_experts: int
+    n_routed_experts: int
+    num_experts_per_tok: int
+    moe_layer_freq: int
+    first_k_dense_replace: int
+    norm_topk_prob: bool
+    hidden_act: str
+    rms_norm_eps: float
+    rope_theta: float = 10000.0
+    kv_cache_dtype: Optional[str] = None
+    context_window_size: int = 0
+    prefill_chunk_size: int = 0
+    tensor_parallel_shards: int = 1
+    max_batch_size: int = 1
+    head_dim: int = 0
+    kwargs: Dict[str, Any] = dataclasses.field(default_factory=dict)
+
+    def __post_init__(self):
+        if self.context_window_size == 0:
+            for name in ["max_position_embeddings", "max_sequence_length"]:
+                if name in self.kwargs:
+                    self.context_window_size = self.kwargs.pop(name)
+                    logger.info(
+                        "%s not found in config.json. Falling back to %s (%d)",
+                        bold("context_window_size"),
+                        bold(name),
+                        self.context_window_size,
+                    )
+                    break
+            else:
+                raise ValueError(
+                    "Unable to determine the maximum sequence length, because none of "
+                    "`context_window_size`, `max_position_embeddings` or `max_sequence_length` is "
+                    "provided in `config.json`."
+                )
+        if self.head_dim == 0:
+            self.head_dim = self.hidden_size // self.num_attention_heads
+        assert self.head_dim * self.num_attention_heads == self.hidden_size
+        if self.prefill_chunk_size == 0:
+            logger.info(
+                "%s defaults to %d",
+                bold("prefill_chunk_size"),
+                min(self.context_window_size, 2048),
+            )
+            self.prefill_chunk_size = min(self.context_window_size, 2048)
+        elif self.prefill_chunk_size > self.context_window_size:
+            logger.info(
+                "Overriding %s from %d to %d",
+                bold("prefill_chunk_size"),
+                self.prefill_chunk_size,
+                min(self.context_window_size, 2048),
+            )
+            self.prefill_chunk_size = min(self.context_window_size, 2048)
+
+
+# pylint: disable=invalid-name,missing-docstring,too-many-locals
+
+
+def _swiglu_fused(concat_x1_x2: Tensor, intermediate_size: int) -> Tensor:
+    """Compute `silu(x1) * x2` directly on the concatenated gate/up projection.
+
+    The naive `split` + `silu` + `multiply` sequence materializes three
+    intermediate tensors of shape `[..., intermediate_size]`, each written to
+    and re-read from DRAM. Reading `x1` and `x2` out of the concatenated
+    buffer inside a single TE compute halves the memory traffic on the
+    SwiGLU path.
+    """
+
+    def _swiglu(x: te.Tensor):
+        def _compute(*idx):
+            x1 = x(*idx)
+            x2 = x(*idx[:-1], idx[-1] + intermediate_size)
+            return te.sigmoid(x1) * x1 * x2
+
+        return te.compute((*x.shape[:-1], intermediate_size), _compute, name="swiglu_fused")
+
+    return op.tensor_expr_op(_swiglu, name_hint="swiglu_fused", args=[concat_x1_x2])
+
+
+class DeepseekAttention(nn.Module):  # pylint: disable=too-many-instance-attributes
+    def __init__(self, config: DeepseekConfig):
+        self.head_dim = config.head_dim
+        if config.num_attention_heads % config.tensor_parallel_shards != 0:
+            raise ValueError(
+                f"Cannot split {config.num_attention_heads} attention heads "
+                f"evenly to {config.tensor_parallel_shards} GPUs."
+            )
+        self.num_q_heads = config.num_attention_heads // config.tensor_parallel_shards
+        if config.num_key_value_heads % config.tensor_parallel_shards != 0:
+            raise ValueError(
+                f"Cannot split {config.num_key_value_heads} key-value heads "
+                f"evenly to {config.tensor_parallel_shards} GPUs."
+            )
+        self.num_kv_heads = config.num_key_value_heads // config.tensor_parallel_shards
+        self.wqkv_pack = nn.Linear(
+            in_features=config.hidden_size,
+            out_features=(self.num_q_heads + 2 * self.num_kv_heads) * self.head_dim,
+            bias=False,
+        )
+        self.o_proj = nn.Linear(self.num_q_heads * self.head_dim, config.hidden_size, bias=False)
+
+    def forward(self, hidden_states: Tensor, paged_kv_cache: PagedKVCache, layer_id: int):
+        d, h_q = self.head_dim, self.num_q_heads
+        b, s, _ = hidden_states.shape
+        # Pass the packed projection directly: the head split happens inside
+        # attention_with_fused_qkv, with no reshape node between the matmul
+        # and the attention call.
+        qkv = self.wqkv_pack(hidden_states)
+        output = op.reshape(
+            paged_kv_cache.attention_with_fused_qkv(layer_id, qkv, h_q, head_dim=d),
+            (b, s, h_q * d),
+        )
+        return self.o_proj(output)
+
+
+class DeepseekMLP(nn.Module):
+    def __init__(self, config: DeepseekConfig, intermediate_size: Optional[int] = None):
+        super().__init__()
+        intermediate_size = intermediate_size or config.intermediate_size
+        if intermediate_size % config.tensor_parallel_shards != 0:
+            raise ValueError(
+                f"Cannot split MLP intermediate size {intermediate_size} "
+                f"evenly to {config.tensor_parallel_shards} GPUs."
+            )
+        self.intermediate_size = intermediate_size // config.tensor_parallel_shards
+        self.gate_up_proj = nn.Linear(config.hidden_size, 2 * self.intermediate_size, bias=False)
+        self.down_proj = nn.Linear(self.intermediate_size, config.hidden_size, bias=False)
+
+    def forward(self, x: Tensor):
+        concat_x1_x2 = self.gate_up_proj(x)
+        return self.down_proj(_swiglu_fused(concat_x1_x2, self.intermediate_size))
+
+
+class DeepseekMoE(nn.Module):  # pylint: disable=too-many-instance-attributes
+    """MoE layer for Deepseek model, with `n_shared_experts` always-active experts."""
+
+    def __init__(self, config: DeepseekConfig):
+        super().__init__()
+        self.num_experts_per_tok = config.num_experts_per_tok
+        self.n_routed_experts = config.n_routed_experts
+        self.norm_topk_prob = config.norm_topk_prob
+        if config.moe_intermediate_size % config.tensor_parallel_shards != 0:
+            raise ValueError(
+                f"Cannot split MoE intermediate size {config.moe_intermediate_size} "
+                f"evenly to {config.tensor_parallel_shards} GPUs."
+            )
+        self.moe_intermediate_size = config.moe_intermediate_size // config.tensor_parallel_shards
+        self.gate = nn.Linear(
+            in_features=config.hidden_size,
+            out_features=config.n_routed_experts,
+            bias=False,
+        )
+        self.moe_gate_up_proj = MixtralExperts(
+            self.n_routed_experts,
+            in_features=config.hidden_size,
+            out_features=2 * self.moe_intermediate_size,
+        )
+        self.moe_down_proj = MixtralExperts(
+            self.n_routed_experts,
+            in_features=self.moe_intermediate_size,
+            out_features=config.hidden_size,
+        )
+        self.shared_experts = DeepseekMLP(
+            config,
+            intermediate_size=config.moe_intermediate_size * config.n_shared_experts,
+        )
+
+    def _expert_forward(self, x: Tensor, indptr: Tensor, gather_indices: Optional[Tensor] = None):
+        if gather_indices is None:
+            x1_x2 = self.moe_gate_up_proj(x, indptr)
+        else:
+            x1_x2 = self.moe_gate_up_proj(x, indptr, gather_indices=gather_indices)
+        x = self.moe_down_proj(_swiglu_fused(x1_x2, self.moe_intermediate_size), indptr)
+        return x
+
+    def forward_decode(self, x: Tensor):
+        """Single-token specialization of `forward`, selected at trace time when
+        the input shape is statically `[1, 1, hidden_size]`.
+
+        The cumsum/get_indices/get_indptr/take/scatter machinery exists only to
+        group a batch of tokens by expert; with one token the expert indices
+        feed the per-token gemv kernel directly, and the weighted combination
+        of the `experts_per_tok` expert outputs is a single [1, k] x [k, hidden]
+        matmul instead of a broadcast-multiply followed by `moe_sum`.
+        """
+        experts_per_tok = self.num_experts_per_tok
+        batch_size, seq_len, hidden_size = x.shape
+        x = x.reshape(1, hidden_size)
+        gate = self.gate(x)
+        # expert_weights: [1, experts_per_tok]
+        # expert_indices: [1, experts_per_tok]
+        expert_weights, expert_indices = op_ext.moe_misc.gating_softmax_topk(
+            gate, experts_per_tok, norm_topk_prob=self.norm_topk_prob
+        )
+        # moe_hidden_states: [experts_per_tok, hidden_size]
+        moe_hidden_states = self._expert_forward(x, expert_indices)
+        # moe_hidden_states: [1, hidden_size]
+        moe_hidden_states = op.matmul(expert_weights, moe_hidden_states)
+        final_hidden_states = moe_hidden_states + self.shared_experts(x)
+        return final_hidden_states.reshape(batch_size, seq_len, hidden_size)
+
+    def forward(self, x: Tensor):
+        experts_per_tok = self.num_experts_per_tok
+        num_experts = self.n_routed_experts
+        batch_size, seq_len, hidden_size = x.shape
+        num_tokens = batch_size * seq_len
+        x = x.reshape(num_tokens, hidden_size)
+        gate = self.gate(x)
+        # expert_weights: [num_tokens, experts_per_tok]
+        # expert_indices: [num_tokens, experts_per_tok]
+        expert_weights, expert_indices = op_ext.moe_misc.gating_softmax_topk(
+            gate, experts_per_tok, norm_topk_prob=self.norm_topk_prob
+        )
+        if num_tokens == 1:
+            # x: [num_tokens * experts_per_tok, hidden_size]
+            moe_hidden_states = self._expert_forward(x, expert_indices)
+        else:
+            # cumsum: [num_tokens * num_experts]
+            cumsum = op_ext.moe_misc.moe_cumsum(expert_indices, num_experts)
+            # indices: [num_tokens * experts_per_tok]
+            reverse_indices, token_indices = op_ext.moe_misc.get_indices(cumsum, expert_indices)
+            # indptr: [num_experts + 1]
+            indptr = op_ext.moe_misc.get_indptr(
+                cumsum, num_experts, num_tokens, inclusive=False, out_dtype="int32"
+            )
+            if isinstance(self.moe_gate_up_proj, MixtralExperts):
+                # the per-expert token rows are gathered on the fly inside the
+                # grouped GEMM, without materializing the permuted
+                # [num_tokens * experts_per_tok, hidden_size] input
+                moe_hidden_states = self._expert_forward(x, indptr, gather_indices=token_indices)
+            else:
+                moe_hidden_states = op.take(x, token_indices, axis=0)
+                moe_hidden_states = self._expert_forward(moe_hidden_states, indptr)
+            moe_hidden_states = op_ext.moe_misc.scatter_output(moe_hidden_states, reverse_indices)
+        # moe_hidden_states: [num_tokens, hidden_size], with the gating weights
+        # applied inside the reduction accumulator
+        moe_hidden_states = op_ext.moe_misc.moe_weighted_sum(moe_hidden_states, expert_weights)
+        final_hidden_states = moe_hidden_states + self.shared_experts(x)
+        final_hidden_states = final_hidden_states.reshape(batch_size, seq_len, hidden_size)
+        return final_hidden_states
+
+
+class DeepseekDecoderLayer(nn.Module):
+    def __init__(self, config: DeepseekConfig, layer_id: int):
+        super().__init__()
+        self.self_attn = DeepseekAttention(config)
+        self.mlp = (
+            DeepseekMoE(config)
+            if layer_id >= config.first_k_dense_replace and layer_id % config.moe_layer_freq == 0
+            else DeepseekMLP(config)
+        )
+        self.input_layernorm = nn.RMSNorm(config.hidden_size, -1, config.rms_norm_eps, bias=False)
+        self.post_attention_layernorm = nn.RMSNorm(
+            config.hidden_size, -1, config.rms_norm_eps, bias=False
+        )
+
+        def _set_tp():
+            def _set(layer, hint):
+                layer.attrs["shard_strategy"] = hint
+
+            hd = config.head_dim
+            q = self.self_attn.num_q_heads * hd
+            k = self.self_attn.num_kv_heads * hd
+            v = self.self_attn.num_kv_heads * hd
+            _set(
+                self.self_attn.wqkv_pack.weight,
+                tp.ShardSingleDim("_shard_qkv_weight", dim=0, segs=[q, k, v]),
+            )
+            _set(self.self_attn.o_proj.weight, tp.ShardSingleDim("_shard_o", dim=1))
+            if isinstance(self.mlp, DeepseekMoE):
+                si = self.mlp.shared_experts.intermediate_size
+                mi = self.mlp.moe_intermediate_size
+                _set(
+                    self.mlp.shared_experts.gate_up_proj.weight,
+                    tp.ShardSingleDim("_shard_shared_mlp_up", segs=[si, si], dim=0),
+                )
+                _set(
+                    self.mlp.shared_experts.down_proj.weight,
+                    tp.ShardSingleDim("_shard_shared_mlp_down", dim=1),
+                )
+                _set(
+                    self.mlp.moe_gate_up_proj.weight,
+                    tp.ShardSingleDim("_shard_moe_mlp_up", segs=[mi, mi], dim=1),
+                )
+                _set(self.mlp.moe_down_proj.weight, tp.ShardSingleDim("_shard_moe_mlp_down", dim=2))
+            else:
+                i = self.mlp.intermediate_size
+                _set(
+                    self.mlp.gate_up_proj.weight,
+                    tp.ShardSingleDim("_shard_mlp_up", segs=[i, i], dim=0),
+                )
+                _set(self.mlp.down_proj.weight, tp.ShardSingleDim("_shard_mlp_down", dim=1))
+
+        self.tensor_parallel_shards = config.tensor_parallel_shards
+        _set_tp()
+
+    def forward(self, hidden_states: Tensor, paged_kv_cache: PagedKVCache, layer_id: int):
+        out = self.self_attn(self.input_layernorm(hidden_states), paged_kv_cache, layer_id)
+        hidden_states = self._apply_residual(out, residual=hidden_states)
+        out = self.post_attention_layernorm(hidden_states)
+        if isinstance(self.mlp, DeepseekMoE) and self._is_single_token(hidden_states):
+            out = self.mlp.forward_decode(out)
+        else:
+            out = self.mlp(out)
+        hidden_states = self._apply_residual(out, residual=hidden_states)
+        return hidden_states
+
+    @staticmethod
+    def _is_single_token(hidden_states: Tensor) -> bool:
+        # True only when batch and seq dims are static literals multiplying to 1,
+        # i.e. the `decode` entry point; `batch_decode` has a symbolic batch dim.
+        batch_size, seq_len, _ = hidden_states.shape
+        return (
+            isinstance(batch_size, int) and isinstance(seq_len, int) and batch_size * seq_len == 1
+        )
+
+    def _apply_residual(self, out, residual):
+        if self.tensor_parallel_shards > 1:
+            return op.ccl_allreduce(out, "sum") + residual
+        return out + residual
+
+
+class DeepseekModel(nn.Module):
+    def __init__(self, config: DeepseekConfig):
+        self.embed_tokens = nn.Embedding(config.vocab_size, config.hidden_size)
+        self.layers = nn.ModuleList(
+            [
+                DeepseekDecoderLayer(config, layer_id)
+                for layer_id in range(config.num_hidden_layers)
+            ]
+        )
+        self.norm = nn.RMSNorm(config.hidden_size, -1, config.rms_norm_eps, bias=False)
+
+    def forward(self, inputs: Tensor, paged_kv_cache: PagedKVCache):
+        hidden_states = inputs
+        for layer_id, layer in enumerate(self.layers):
+            hidden_states = layer(hidden_states, paged_kv_cache, layer_id)
+        hidden_states = self.norm(hidden_states)
+        return hidden_states
+
+
+class DeepseekForCausalLM(nn.Module):
+    def __init__(self, config: DeepseekConfig):
+        self.config = config
+        self.model = DeepseekModel(config)
+        self.lm_head = nn.Linear(config.hidden_size, config.vocab_size, bias=False)
+        self.dtype = "float32"
+        self.tensor_parallel_shards = config.tensor_parallel_shards
+
+    def to(self, dtype: Optional[str] = None):
+        super().to(dtype=dtype)
+        if dtype is not None:
+            self.dtype = dtype
+
+    def _lm_head_forward(self, hidden_states: Tensor):
+        """Compute the final logits in float32. For an unquantized lm_head the promotion
+        happens in the matmul epilogue (`out_dtype="float32"`), so no separate cast pass
+        over the [*, vocab_size] logits is emitted."""
+        if isinstance(self.lm_head, nn.Linear):
+            weight = op.permute_dims(self.lm_head.weight)
+            return op.matmul(hidden_states, weight, out_dtype="float32")
+        logits = self.lm_head(hidden_states)
+        if logits.dtype != "float32":
+            logits = logits.astype("float32")
+        return logits
+
+    def batch_forward(
+        self,
+        input_embeds: Tensor,
+        paged_kv_cache: PagedKVCache,
+        logit_positions: Optional[Tensor] = None,
+    ):
+        op_ext.configure()
+
+        hidden_states = self.model(input_embeds, paged_kv_cache)
+        if logit_positions is not None:
+            hidden_states = op.take(hidden_states, logit_positions, axis=1)
+        return self._lm_head_forward(hidden_states)
+
+    def embed(self, input_ids: Tensor):
+        if self.tensor_parallel_shards > 1:
+            input_ids = op.ccl_broadcast_from_worker0(input_ids)
+        return self.model.embed_tokens(input_ids)
+
+    def prefill(self, input_embed: Tensor, paged_kv_cache: PagedKVCache):
+        op_ext.configure()
+
+        hidden_states = self.model(input_embed, paged_kv_cache)
+        # Take the last-position hidden state as a strided view rather than a
+        # TE compute that copies batch * hidden_size elements; lm_head reads
+        # the row directly out of the existing buffer.
+        _, s, _ = hidden_states.shape
+        hidden_states = wrap_nested(
+            strided_slice(
+                hidden_states._expr,  # pylint: disable=protected-access
+                axes=[1],
+                begin=[s - 1],
+                end=[s],
+            ),
+            name="slice",
+        )
+        logits = self._lm_head_forward(hidden_states)
+        return logits, paged_kv_cache
+
+    def decode(self, input_embed: Tensor, paged_kv_cache: PagedKVCache):
+        op_ext.configure()
+
+        hidden_states = self.model(input_embed, paged_kv_cache)
+        logits = self._lm_head_forward(hidden_states)
+        return logits, paged_kv_cache
+
+    def batch_prefill(
+        self, input_embeds: Tensor, logit_positions: Tensor, paged_kv_cache: PagedKVCache
+    ):
+        if self.tensor_parallel_shards > 1:
+            logit_positions = op.ccl_broadcast_from_worker0(logit_positions)
+        logits = self.batch_forward(input_embeds, paged_kv_cache, logit_positions)
+        return logits, paged_kv_cache
+
+    def batch_decode(self, input_embeds: Tensor, paged_kv_cache: PagedKVCache):
+        logits = self.batch_forward(input_embeds, paged_kv_cache)
+        return logits, paged_kv_cache
+
+    def batch_verify(self, input_embeds: Tensor, paged_kv_cache: PagedKVCache):
+        logits = self.batch_forward(input_embeds, paged_kv_cache)
+        return logits, paged_kv_cache
+
+    def create_paged_kv_cache(  # pylint: disable=too-many-arguments
+        self,
+        max_batch_size: tir.Var,
+        max_total_seq_len: tir.Var,
+        prefill_chunk_size: tir.Var,
+        page_size: tir.Var,
+        support_sliding_window: tir.Var,
+    ) -> PagedKVCache:
+        return PagedKVCache.create_generic(
+            max_batch_size=max_batch_size,
+            max_total_seq_len=max_total_seq_len,
+            prefill_chunk_size=prefill_chunk_size,
+            page_size=page_size,
+            support_sliding_window=support_sliding_window,
+            num_hidden_layers=self.config.num_hidden_layers,
+            num_attention_heads=self.config.num_attention_heads // self.tensor_parallel_shards,
+            num_key_value_heads=self.config.num_key_value_heads // self.tensor_parallel_shards,
+            head_dim=self.config.head_dim,
+            rope_mode=RopeMode.NORMAL,
+            rope_scale=1,
+            rope_theta=self.config.rope_theta,
+            dtype=self.dtype,
+            kv_storage_dtype=self.config.kv_cache_dtype,
+        )
+
+    def get_default_spec(self):
+        mod_spec = {
+            "embed": {
+                "input_ids": nn.spec.Tensor(["seq_len"], "int32"),
+                "$": {
+                    "param_mode": "packed",
+                    "effect_mode": "none",
+                },
+            },
+            "prefill": {
+                "input_embed": nn.spec.Tensor([1, "seq_len", self.config.hidden_size], self.dtype),
+                "paged_kv_cache": nn.spec.Object(object_type=PagedKVCache),
+                "$": {
+                    "param_mode": "packed",
+                    "effect_mode": "none",
+                },
+            },
+            "decode": {
+                "input_embed": nn.spec.Tensor([1, 1, self.config.hidden_size], self.dtype),
+                "paged_kv_cache": nn.spec.Object(object_type=PagedKVCache),
+                "$": {
+                    "param_mode": "packed",
+                    "effect_mode": "none",
+                },
+            },
+            "batch_prefill": {
+                "input_embeds": nn.spec.Tensor([1, "seq_len", self.config.hidden_size], self.dtype),
+                "logit_positions": nn.spec.Tensor(["batch_size"], "int32"),
+                "paged_kv_cache": nn.spec.Object(object_type=PagedKVCache),
+                "$": {
+                    "param_mode": "packed",
+                    "effect_mode": "none",
+                },
+            },
+            "batch_decode": {
+                "input_embeds": nn.spec.Tensor(
+                    ["batch_size", 1, self.config.hidden_size], self.dtype
+                ),
+                "paged_kv_cache": nn.spec.Object(object_type=PagedKVCache),
+                "$": {
+                    "param_mode": "packed",
+                    "effect_mode": "none",
+                },
+            },
+            "batch_verify": {
+                "input_embeds": nn.spec.Tensor([1, "seq_len", self.config.hidden_size], self.dtype),
+                "paged_kv_cache": nn.spec.Object(object_type=PagedKVCache),
+                "$": {
+                    "param_mode": "packed",
+                    "effect_mode": "none",
+                },
+            },
+            "create_paged_kv_cache": {
+                "max_batch_size": int,
+                "max_total_seq_len": int,
+                "prefill_chunk_size": int,
+                "page_size": int,
+                "support_sliding_window": int,
+                "$": {
+                    "param_mode": "none",
+                    "effect_mode": "none",
+                },
+            },
+        }
+        return nn.spec.ModuleSpec.from_raw(mod_spec, self)
@@ -0,0 +1,64 @@
+"""This file specifies how MLC's Deepseek parameters are quantized using group quantization
+or other formats."""
+
+from typing import Tuple
+
+from tvm.relax.frontend import nn
+
+from mlc_llm.loader import QuantizeMapping
+from mlc_llm.quantization import FTQuantize, GroupQuantize, NoQuantize, PerTensorQuantize
+
+from .deepseek_model import DeepseekConfig, DeepseekForCausalLM
+
+
+def group_quant(
+    model_config: DeepseekConfig,
+    quantization: GroupQuantize,
+) -> Tuple[nn.Module, QuantizeMapping]:
+    """Quantize a Deepseek-architecture model using group quantization."""
+    model: nn.Module = DeepseekForCausalLM(model_config)
+    model.to(quantization.model_dtype)
+    quant_map = QuantizeMapping({}, {})
+    quantization.tensor_parallel_shards = model_config.tensor_parallel_shards
+    model = quantization.quantize_model(model, quant_map, "")
+    return model, quant_map
+
+
+def ft_quant(
+    model_config: DeepseekConfig,
+    quantization: FTQuantize,
+) -> Tuple[nn.Module, QuantizeMapping]:
+    """Quantize a Deepseek model using FasterTransformer quantization."""
+    model: nn.Module = DeepseekForCausalLM(model_config)
+    model.to(quantization.model_dtype)
+    quant_map = QuantizeMapping({}, {})
+    model = quantization.quantize_model(model, quant_map, "")
+    return model, quant_map
+
+
+def no_quant(
+    model_config: DeepseekConfig,
+    quantization: NoQuantize,
+) -> Tuple[nn.Module, QuantizeMapping]:
+    """Quantize a Deepseek model without quantization."""
+    model: nn.Module = DeepseekForCausalLM(model_config)
+    model.to(quantization.model_dtype)
+    quant_map = QuantizeMapping({}, {})
+    return model, quant_map
+
+
+def per_tensor_quant(
+    model_config: DeepseekConfig,
+    quantization: PerTensorQuantize,
+) -> Tuple[nn.Module, QuantizeMapping]:
+    """Quantize a Deepseek model using per-tensor quantization."""
+    model: nn.Module = DeepseekForCausalLM(model_config)
+    model.to(quantization.model_dtype)
+    quant_map = QuantizeMapping({}, {})
+    model = quantization.quantize_model(
+        model,
+        quant_map,
+        "",
+        tensor_parallel_shards=model_config.tensor_parallel_shards,
+    )
+    return model, quant_map
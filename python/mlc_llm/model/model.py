@@ -11,6 +11,7 @@ from mlc_llm.quantization.quantization import Quantization
 from .baichuan import baichuan_loader, baichuan_model, baichuan_quantization
 from .bert import bert_loader, bert_model, bert_quantization
 from .chatglm3 import chatglm3_loader, chatglm3_model, chatglm3_quantization
+from .deepseek import deepseek_loader, deepseek_model, deepseek_quantization
 from .eagle import eagle_loader, eagle_model, eagle_quantization
 from .gemma import gemma_loader, gemma_model, gemma_quantization
 from .gpt2 import gpt2_loader, gpt2_model, gpt2_quantization
@@ -413,4 +414,19 @@ MODELS: Dict[str, Model] = {
             "no-quant": medusa_quantization.no_quant,
         },
     ),
+    "deepseek": Model(
+        name="deepseek",
+        model=deepseek_model.DeepseekForCausalLM,
+        config=deepseek_model.DeepseekConfig,
+        source={
+            "huggingface-torch": deepseek_loader.huggingface,
+            "huggingface-safetensor": deepseek_loader.huggingface,
+        },
+        quantize={
+            "no-quant": deepseek_quantization.no_quant,
+            "group-quant": deepseek_quantization.group_quant,
+            "ft-quant": deepseek_quantization.ft_quant,
+            "per-tensor-quant": deepseek_quantization.per_tensor_quant,
+        },
+    ),
 }
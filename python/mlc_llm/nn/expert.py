@@ -1,7 +1,9 @@
 """An nn.Module that represents MoE experts"""
 
+from typing import Optional
+
 from tvm.relax.frontend import nn
-from tvm.relax.frontend.nn import Tensor
+from tvm.relax.frontend.nn import Tensor, op
 
 from mlc_llm.op import cutlass, extern, ft_gemm, moe_matmul
 
@@ -17,14 +19,21 @@ class MixtralExperts(nn.Module):
         self.dtype = "float32"
         self.tensor_parallel_shards = tensor_parallel_shards
 
-    def forward(self, x: Tensor, indptr: Tensor):  # pylint: disable=invalid-name,missing-docstring
+    def forward(  # pylint: disable=invalid-name,missing-docstring
+        self, x: Tensor, indptr: Tensor, gather_indices: Optional[Tensor] = None
+    ):
         assert x.ndim == 2
         if indptr.ndim == 2:
             assert indptr.shape[0] == 1
+            assert gather_indices is None
             return moe_matmul.gemv(x, self.weight, indptr)
         assert indptr.ndim == 1
         if extern.get_store().cutlass_group_gemm and self.dtype == "float16":
+            if gather_indices is not None:
+                x = op.take(x, gather_indices, axis=0)
             return cutlass.group_gemm(x, self.weight, indptr)
         if extern.get_store().faster_transformer and self.dtype == "float16":
+            if gather_indices is not None:
+                x = op.take(x, gather_indices, axis=0)
             return ft_gemm.faster_transformer_moe_gemm(x, self.weight, indptr)
-        return moe_matmul.group_gemm(x, self.weight, indptr)
+        return moe_matmul.group_gemm(x, self.weight, indptr, gather_indices)
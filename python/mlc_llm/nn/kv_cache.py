@@ -48,17 +48,24 @@ class PagedKVCache(Object):  # pylint: disable=too-few-public-methods
         num_key_value_heads: int,
         head_dim: int,
         rope_mode: RopeMode,
-        rope_scale: int,
-        rope_theta: int,
+        rope_scale: float,
+        rope_theta: float,
         dtype: str,
         rotary_dim: Optional[int] = None,
+        kv_storage_dtype: Optional[str] = None,
         name: str = "paged_kv_cache",
     ) -> "PagedKVCache":
         """The generic function of creating a PagedKVCache,
         which will be rewritten by functions in compilation pipeline.
+
+        When `kv_storage_dtype` differs from `dtype` (e.g. "e4m3_float8"),
+        the cached k/v data is stored in that narrower dtype and converted
+        back to `dtype` inside the attention kernels, halving KV bandwidth.
         """
         if rotary_dim is None:
             rotary_dim = head_dim
+        if kv_storage_dtype is None:
+            kv_storage_dtype = dtype
         return PagedKVCache(
             _expr=rx.call_pure_packed(
                 "mlc.create_paged_kv_cache_generic",
@@ -80,6 +87,7 @@ class PagedKVCache(Object):  # pylint: disable=too-few-public-methods
                 rx.PrimValue(rope_theta),
                 rx.PrimValue(rotary_dim),
                 rx.DataTypeImm(dtype),
+                rx.DataTypeImm(kv_storage_dtype),
                 sinfo_args=rx.ObjectStructInfo(),
             ),
             _name=name,
@@ -91,6 +99,7 @@ class PagedKVCache(Object):  # pylint: disable=too-few-public-methods
         qkv: Tensor,
         num_qo_heads: int,
         attn_score_scaling_factor: float = 1.0,
+        head_dim: Optional[int] = None,
     ) -> Tensor:
         """Compute attention with the given fused q/k/v data and in-cache k/v data
         on the specified layer. Rotary position embeddings are applied to k/v
@@ -103,10 +112,22 @@ class PagedKVCache(Object):  # pylint: disable=too-few-public-methods
         - The input qkv have `2 * num_qo_heads + num_kv_heads` at the third dim.
         - The output tensor have `num_qo_heads` at the third dim.
         - The input qkv and output tensor have `head_dim` at the last dim.
+
+        The input qkv may alternatively be the 3-D output of the fused QKV
+        projection, with `(num_qo_heads + 2 * num_kv_heads) * head_dim` at the
+        last dim, in which case `head_dim` is required and the head split is
+        folded into the flattening reshape here rather than emitted as a
+        separate reshape node in the model graph.
         """
         # pylint: disable=protected-access
-        b, s, _, d = qkv._expr.struct_info.shape
-        qkv = qkv.reshape(b * s, qkv.shape[2], d)
+        if qkv.ndim == 3:
+            assert head_dim is not None, "head_dim is required when the input qkv is 3-D"
+            b, s, f = qkv._expr.struct_info.shape
+            d = head_dim
+            qkv = qkv.reshape(b * s, f // d, d)
+        else:
+            b, s, _, d = qkv._expr.struct_info.shape
+            qkv = qkv.reshape(b * s, qkv.shape[2], d)
         return Tensor(
             _expr=rx.BlockBuilder.current().emit(
                 rx.call_dps_packed(
@@ -169,10 +190,13 @@ class FlashInferPagedKVCache(PagedKVCache):  # pylint: disable=too-few-public-me
         rope_theta: int,
         rotary_dim: int,
         dtype: str,
+        kv_storage_dtype: str,
         target: Target,
         name: str = "paged_kv_cache",
     ) -> None:
         """Create a paged KV cache object with FlashInfer kernels.
+        FlashInfer kernels require the KV storage dtype to match `dtype`,
+        which the KV cache creation dispatch guarantees.
 
         Parameters
         ----------
@@ -228,14 +252,14 @@ class FlashInferPagedKVCache(PagedKVCache):  # pylint: disable=too-few-public-me
             rx.PrimValue(rope_mode),
             rx.PrimValue(rope_scale),
             rx.PrimValue(rope_theta),
-            rx.op.zeros((), dtype),
+            rx.op.zeros((), kv_storage_dtype),
             # pylint: disable=line-too-long
             # fmt: off
-            bb.add_func(_kv_cache_transpose_append(num_key_value_heads, head_dim, dtype), "kv_cache_transpose_append"),
+            bb.add_func(_kv_cache_transpose_append(num_key_value_heads, head_dim, dtype, kv_storage_dtype), "kv_cache_transpose_append"),
             rx.extern("flashinfer.attention_kernel_prefill_with_paged_kv_cache"),
             rx.extern("flashinfer.attention_kernel_decode_with_paged_kv_cache"),
-            bb.add_func(_attention_prefill(num_key_value_heads, num_attention_heads, head_dim, dtype, True, target), "tir_attention_prefill_sliding_window"),
-            bb.add_func(_attention_decode(num_key_value_heads, num_attention_heads, head_dim, dtype, True, target), "tir_attention_decode_sliding_window"),
+            bb.add_func(_attention_prefill(num_key_value_heads, num_attention_heads, head_dim, dtype, kv_storage_dtype, True, target), "tir_attention_prefill_sliding_window"),
+            bb.add_func(_attention_decode(num_key_value_heads, num_attention_heads, head_dim, dtype, kv_storage_dtype, True, target), "tir_attention_decode_sliding_window"),
             rx.extern("flashinfer.attention_kernel_prefill_with_ragged_kv_cache"),
             rx.extern("flashinfer.attention_kernel_prefill_with_ragged_kv_cache_begin_forward"),
             rx.extern("flashinfer.attention_kernel_prefill_with_ragged_kv_cache_end_forward"),
@@ -245,9 +269,9 @@ class FlashInferPagedKVCache(PagedKVCache):  # pylint: disable=too-few-public-me
             rx.extern("flashinfer.attention_kernel_decode_with_paged_kv_cache_end_forward"),
             rx.extern("flashinfer.merge_state_in_place"),
             bb.add_func(llama_rope_with_position_map(rope_theta, rope_scale, head_dim, num_attention_heads, num_key_value_heads, dtype, rotary_dim), "tir_split_rotary"),
-            bb.add_func(_copy_single_page(num_key_value_heads, page_size, head_dim, dtype, target), "kv_cache_copy_single_page"),
-            bb.add_func(_kv_cache_debug_get_kv(num_hidden_layers, num_key_value_heads, head_dim, dtype), "kv_cache_debug_get_kv"),
-            bb.add_func(_compact_kv_copy(num_key_value_heads, head_dim, dtype, target), "kv_cache_compact_kv_copy"),
+            bb.add_func(_copy_single_page(num_key_value_heads, page_size, head_dim, kv_storage_dtype, target), "kv_cache_copy_single_page"),
+            bb.add_func(_kv_cache_debug_get_kv(num_hidden_layers, num_key_value_heads, head_dim, dtype, kv_storage_dtype), "kv_cache_debug_get_kv"),
+            bb.add_func(_compact_kv_copy(num_key_value_heads, head_dim, kv_storage_dtype, target), "kv_cache_compact_kv_copy"),
             bb.add_func(tree_attn(num_key_value_heads, num_attention_heads, head_dim, dtype, target), "tir_attention_prefill_with_tree_mask"),
             # fmt: on
             # pylint: enable=line-too-long
@@ -281,6 +305,7 @@ class TIRPagedKVCache(PagedKVCache):  # pylint: disable=too-few-public-methods
         rope_theta: int,
         rotary_dim: int,
         dtype: str,
+        kv_storage_dtype: str,
         target: Target,
         name: str = "paged_kv_cache",
     ) -> None:
@@ -318,6 +343,10 @@ class TIRPagedKVCache(PagedKVCache):  # pylint: disable=too-few-public-methods
             The base of rotary position embedding.
         rotary_dim : int
             The number of dimensions in the embedding that RoPE is applied to.
+        kv_storage_dtype : str
+            The dtype in which the cached k/v data is stored. When narrower
+            than `dtype` (e.g. "e4m3_float8"), k/v data is cast on append and
+            cast back to `dtype` on load inside the attention kernels.
         target : Target
             The target to build the model to.
         """
@@ -340,20 +369,20 @@ class TIRPagedKVCache(PagedKVCache):  # pylint: disable=too-few-public-methods
             rx.PrimValue(rope_mode),
             rx.PrimValue(rope_scale),
             rx.PrimValue(rope_theta),
-            rx.op.zeros((), dtype),
+            rx.op.zeros((), kv_storage_dtype),
             # pylint: disable=line-too-long
             # fmt: off
-            bb.add_func(_kv_cache_transpose_append(num_key_value_heads, head_dim, dtype), "kv_cache_transpose_append"),
-            bb.add_func(_attention_prefill(num_key_value_heads, num_attention_heads, head_dim, dtype, False, target), "tir_attention_prefill"),
-            bb.add_func(_attention_decode(num_key_value_heads, num_attention_heads, head_dim, dtype, False, target), "tir_attention_decode"),
-            bb.add_func(_attention_prefill(num_key_value_heads, num_attention_heads, head_dim, dtype, True, target), "tir_attention_prefill_sliding_window"),
-            bb.add_func(_attention_decode(num_key_value_heads, num_attention_heads, head_dim, dtype, True, target), "tir_attention_decode_sliding_window"),
+            bb.add_func(_kv_cache_transpose_append(num_key_value_heads, head_dim, dtype, kv_storage_dtype), "kv_cache_transpose_append"),
+            bb.add_func(_attention_prefill(num_key_value_heads, num_attention_heads, head_dim, dtype, kv_storage_dtype, False, target), "tir_attention_prefill"),
+            bb.add_func(_attention_decode(num_key_value_heads, num_attention_heads, head_dim, dtype, kv_storage_dtype, False, target), "tir_attention_decode"),
+            bb.add_func(_attention_prefill(num_key_value_heads, num_attention_heads, head_dim, dtype, kv_storage_dtype, True, target), "tir_attention_prefill_sliding_window"),
+            bb.add_func(_attention_decode(num_key_value_heads, num_attention_heads, head_dim, dtype, kv_storage_dtype, True, target), "tir_attention_decode_sliding_window"),
             bb.add_func(_attention_prefill_ragged(num_key_value_heads, num_attention_heads, head_dim, dtype, target), "tir_attention_prefill_ragged"),
             bb.add_func(_merge_state_inplace(num_attention_heads, head_dim, dtype, target), "tir_attention_merge_state"),
             bb.add_func(llama_rope_with_position_map(rope_theta, rope_scale, head_dim, num_attention_heads, num_key_value_heads, dtype, rotary_dim), "tir_split_rotary"),
-            bb.add_func(_copy_single_page(num_key_value_heads, page_size, head_dim, dtype, target), "kv_cache_copy_single_page"),
-            bb.add_func(_kv_cache_debug_get_kv(num_hidden_layers, num_key_value_heads, head_dim, dtype), "kv_cache_debug_get_kv"),
-            bb.add_func(_compact_kv_copy(num_key_value_heads, head_dim, dtype, target), "kv_cache_compact_kv_copy"),
+            bb.add_func(_copy_single_page(num_key_value_heads, page_size, head_dim, kv_storage_dtype, target), "kv_cache_copy_single_page"),
+            bb.add_func(_kv_cache_debug_get_kv(num_hidden_layers, num_key_value_heads, head_dim, dtype, kv_storage_dtype), "kv_cache_debug_get_kv"),
+            bb.add_func(_compact_kv_copy(num_key_value_heads, head_dim, kv_storage_dtype, target), "kv_cache_compact_kv_copy"),
             bb.add_func(tree_attn(num_key_value_heads, num_attention_heads, head_dim, dtype, target), "tir_attention_prefill_with_tree_mask"),
             # fmt: on
             # pylint: enable=line-too-long
@@ -372,7 +401,7 @@ class TIRPagedKVCache(PagedKVCache):  # pylint: disable=too-few-public-methods
 # pylint: disable=too-many-locals
 
 
-def _kv_cache_transpose_append(num_key_value_heads, head_dim, dtype):
+def _kv_cache_transpose_append(num_key_value_heads, head_dim, dtype, kv_dtype):
     """Return the TIR function that appends new k/v data to PagedKVCache."""
 
     # pylint: disable=line-too-long,invalid-name
@@ -388,7 +417,7 @@ def _kv_cache_transpose_append(num_key_value_heads, head_dim, dtype):
         ntoken = T.SizeVar("num_tokens_excluding_cache", "int64")
         num_pages = T.int64()
         position_map_elem_offset = T.int32()
-        pages = T.match_buffer(var_pages, (num_pages, 2, num_key_value_heads, 16, head_dim), dtype)
+        pages = T.match_buffer(var_pages, (num_pages, 2, num_key_value_heads, 16, head_dim), kv_dtype)
         k_data = T.match_buffer(var_k_data, (ntoken, num_key_value_heads, head_dim), dtype)
         v_data = T.match_buffer(var_v_data, (ntoken, num_key_value_heads, head_dim), dtype)
         position_map = T.match_buffer(
@@ -401,20 +430,20 @@ def _kv_cache_transpose_append(num_key_value_heads, head_dim, dtype):
                     T.reads(position_map[vgpos], k_data[vgpos, vh, vf])
                     T.writes(pages[position_map[vgpos] // 16, 0, vh, position_map[vgpos] % 16, vf])
                     position: T.int32 = position_map[vgpos]  # type: ignore
-                    pages[T.floordiv(position, 16), 0, vh, T.floormod(position, 16), vf] = k_data[vgpos, vh, vf]
+                    pages[T.floordiv(position, 16), 0, vh, T.floormod(position, 16), vf] = T.cast(k_data[vgpos, vh, vf], kv_dtype)
                 with T.block("v_transpose_append"):
                     vgpos, vh, vf = T.axis.remap("SSS", [global_pos, h, f])
                     T.reads(position_map[vgpos], v_data[vgpos, vh, vf])
                     T.writes(pages[position_map[vgpos] // 16, 1, vh, position_map[vgpos] % 16, vf])
                     position: T.int32 = position_map[vgpos] # type: ignore[name-defined,no-redef]
-                    pages[T.floordiv(position, 16), 1, vh, T.floormod(position, 16), vf] = v_data[vgpos, vh, vf]
+                    pages[T.floordiv(position, 16), 1, vh, T.floormod(position, 16), vf] = T.cast(v_data[vgpos, vh, vf], kv_dtype)
     # fmt: on
     # pylint: enable=line-too-long,invalid-name
 
     return tir_kv_cache_transpose_append
 
 
-def _kv_cache_debug_get_kv(num_hidden_layers, num_key_value_heads, head_dim, dtype):
+def _kv_cache_debug_get_kv(num_hidden_layers, num_key_value_heads, head_dim, dtype, kv_dtype):
     """Return the TIR function that fetches the k/v data on given positions and layer."""
 
     # pylint: disable=line-too-long,invalid-name
@@ -432,7 +461,7 @@ def _kv_cache_debug_get_kv(num_hidden_layers, num_key_value_heads, head_dim, dty
         page_size = T.SizeVar("page_size", "int64")
         num_pages = T.int64()
         position_map_elem_offset = T.int64()
-        pages = T.match_buffer(var_pages, (num_pages, 2, num_key_value_heads, page_size, head_dim), dtype)
+        pages = T.match_buffer(var_pages, (num_pages, 2, num_key_value_heads, page_size, head_dim), kv_dtype)
         position_map = T.match_buffer(
             var_position_map, (seqlen,), "int32", elem_offset=position_map_elem_offset
         )
@@ -444,8 +473,8 @@ def _kv_cache_debug_get_kv(num_hidden_layers, num_key_value_heads, head_dim, dty
                 T.reads(position_map[vp], pages[position_map[vp] // page_size, 0:2, vh, position_map[vp] % page_size, vd])
                 T.writes(k_data[layer_id, vp, vh, vd], v_data[layer_id, vp, vh, vd])
                 position: T.int32 = position_map[vp] # type: ignore[name-defined]
-                k_data[layer_id, vp, vh, vd] = pages[T.floordiv(position, page_size), 0, vh, T.floormod(position, page_size), vd]
-                v_data[layer_id, vp, vh, vd] = pages[T.floordiv(position, page_size), 1, vh, T.floormod(position, page_size), vd]
+                k_data[layer_id, vp, vh, vd] = T.cast(pages[T.floordiv(position, page_size), 0, vh, T.floormod(position, page_size), vd], dtype)
+                v_data[layer_id, vp, vh, vd] = T.cast(pages[T.floordiv(position, page_size), 1, vh, T.floormod(position, page_size), vd], dtype)
     # fmt: on
     # pylint: enable=line-too-long,invalid-name
 
@@ -515,7 +544,7 @@ def _get_seq_offset(pos, seq_id, length_info, sliding_window):
     )
 
 
-def _attention_prefill(h_kv, h_q, d, dtype, sliding_window: bool, target: Target):
+def _attention_prefill(h_kv, h_q, d, dtype, kv_dtype, sliding_window: bool, target: Target):
     # pylint: disable=invalid-name
     NUM_BLKS = 16
     LOAD_VEC = 8 // ((DataType(dtype).bits + 7) // 8)  # 8 bytes
@@ -574,7 +603,7 @@ def _attention_prefill(h_kv, h_q, d, dtype, sliding_window: bool, target: Target
 
         q = T.match_buffer(var_q, (total_len, h_q, d), dtype)
         q_indptr = T.match_buffer(var_q_indptr, (batch_size + 1,), "int32", elem_offset=q_indptr_elem_offset)
-        pages = T.match_buffer(var_pages, (max_num_pages, 2, h_kv, 16, d), dtype)
+        pages = T.match_buffer(var_pages, (max_num_pages, 2, h_kv, 16, d), kv_dtype)
         page_indptr = T.match_buffer(var_page_indptr, (batch_size + 1,), "int32", elem_offset=page_indptr_elem_offset)
         page_values = T.match_buffer(var_page_values, (nnz_pages,), "int32", elem_offset=page_values_elem_offset)
         k_rope_pos_offset = T.match_buffer(var_k_rope_pos_offset, (batch_size,), "int32", elem_offset=k_rope_pos_offset_elem_offset)
@@ -698,7 +727,7 @@ def _attention_prefill(h_kv, h_q, d, dtype, sliding_window: bool, target: Target
                                                     K_smem[i, j] = T.if_then_else(
                                                         rotary_mode == 1,
                                                         _rope(pages, k_rope_pos_offset[b_idx] + cur_L, d, rope_theta, rope_scale, (page_no, 0, by, page_offset, j), dtype),
-                                                        pages[page_no, 0, by, page_offset, j]
+                                                        T.cast(pages[page_no, 0, by, page_offset, j], dtype)
                                                     )
                                                 else:
                                                     K_smem[i, j] = 0.0
@@ -713,7 +742,7 @@ def _attention_prefill(h_kv, h_q, d, dtype, sliding_window: bool, target: Target
                                                     seq_offset: T.int32(is_size_var=True) = _get_seq_offset(cur_L, b_idx, length_info, sliding_window)  # type: ignore
                                                     page_no: T.int32(is_size_var=True) = page_values[cur_page_indptr_begin + T.floordiv(seq_offset, 16)]  # type: ignore
                                                     page_offset: T.int32(is_size_var=True) = T.floormod(seq_offset, 16)  # type: ignore
-                                                    V_smem[i, j] = pages[page_no, 1, by, page_offset, j]
+                                                    V_smem[i, j] = T.cast(pages[page_no, 1, by, page_offset, j], dtype)
                                                 else:
                                                     V_smem[i, j] = 0.0
                                         T.tvm_storage_sync("shared")
@@ -885,6 +914,7 @@ def _attention_decode(
     num_qo_heads,
     head_dim,
     qkv_dtype,
+    kv_dtype,
     sliding_window: bool,
     target: Target,
 ):
@@ -950,7 +980,7 @@ def _attention_decode(
 
         Q = T.match_buffer(Q_handle, (B, H_qo, D), qkv_dtype)
         pages = T.match_buffer(
-            pages_handle, (max_num_pages, 2, H_kv, 16, D), qkv_dtype
+            pages_handle, (max_num_pages, 2, H_kv, 16, D), kv_dtype
         )
         page_table_indptr = T.match_buffer(page_table_indptr_handle, (B + 1,), "int32", elem_offset=page_indptr_elem_offset)
         page_table_values = T.match_buffer(page_table_values_handle, (nnz_pages,), "int32", elem_offset=page_values_elem_offset)
@@ -1041,9 +1071,9 @@ def _attention_decode(
                                                     K_smem[tile_start_s + j, tx * VEC_SIZE + vec] = T.if_then_else(
                                                         rotary_mode == 1,
                                                         _rope(pages, k_rope_pos_offset[batch_idx] + row_g, head_dim, rope_theta, rope_scale, (page_no, 0, by, page_offset, tx * VEC_SIZE + vec), qkv_dtype),
-                                                        pages[page_no, 0, by, page_offset, tx * VEC_SIZE + vec]
+                                                        T.cast(pages[page_no, 0, by, page_offset, tx * VEC_SIZE + vec], qkv_dtype)
                                                     )
-                                                    V_smem[tile_start_s + j, tx * VEC_SIZE + vec] = pages[page_no, 1, by, page_offset, tx * VEC_SIZE + vec]
+                                                    V_smem[tile_start_s + j, tx * VEC_SIZE + vec] = T.cast(pages[page_no, 1, by, page_offset, tx * VEC_SIZE + vec], qkv_dtype)
                                             else:
                                                 for vec in T.vectorized(VEC_SIZE):
                                                     K_smem[tile_start_s + j, tx * VEC_SIZE + vec] = 0.0
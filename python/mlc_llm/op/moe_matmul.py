@@ -296,7 +296,12 @@ def dequantize_float8_gemv(
     )
 
 
-def group_gemm(x: Tensor, w: Tensor, indptr: Tensor):  # pylint: disable=too-many-statements
+def group_gemm(  # pylint: disable=too-many-statements
+    x: Tensor,
+    w: Tensor,
+    indptr: Tensor,
+    gather_indices: Optional[Tensor] = None,
+):
     """Group GEMM in MoE models.
 
     Parameters
@@ -312,10 +317,17 @@ def group_gemm(x: Tensor, w: Tensor, indptr: Tensor):  # pylint: disable=too-man
         Index pointer tensor of shape (num_local_experts + 1, ).
         `x[indptr[a] : indptr[a + 1]]` is the input for the `i`-th local expert.
 
+    gather_indices : Optional[Tensor]
+        When provided, a tensor of shape (num_rows,) of int32 token indices. Row `i` of the
+        GEMM input is then read as `x[gather_indices[i]]` on the fly while loading tiles to
+        shared memory, instead of requiring the caller to materialize the permuted input
+        with a standalone `take`. `indptr` then partitions the rows of `gather_indices`.
+
     Returns
     -------
     out : Tensor
-        Output tensor of shape (batch_size, out_features).
+        Output tensor of shape (batch_size, out_features), or (num_rows, out_features) when
+        `gather_indices` is provided.
     """
     # NOTE: Currently it assumes x.dtype == w.dtype, but the constraint can be relaxed easily.
     (num_local_experts, out_features, in_features), dtype = w.shape, w.dtype
@@ -326,7 +338,14 @@ def group_gemm(x: Tensor, w: Tensor, indptr: Tensor):  # pylint: disable=too-man
     Ne, N, K = num_local_experts, out_features, in_features
     BLK_M, BLK_N, BLK_K = 8, 128, 32
     TX, TY, CTA_COUNT = 8, 32, 1024
-    VEC_X, VEC_W, VEC_O, VEC_DOT = 1, 1, 1, 1
+    VEC_X, VEC_O, VEC_DOT = 1, 1, 1
+    # Each expert's weight block `w[e]` is stored contiguously in row-major (out, in) order,
+    # so the cooperative fetch of a weight tile can use wide vectorized loads whenever `K`
+    # keeps the rows 16-byte aligned. This is the main lever for DRAM burst utilization here;
+    # the X tile is too small to vectorize given the tile sizes above.
+    VEC_W = 128 // DataType(dtype).bits
+    while VEC_W > 1 and (K % VEC_W != 0 or (BLK_N * BLK_K) % (TY * TX * VEC_W) != 0):
+        VEC_W //= 2
     UNROLL = 64
     STORAGE_ALIGN = False
     assert BLK_K % 8 == 0
@@ -423,8 +442,103 @@ def group_gemm(x: Tensor, w: Tensor, indptr: Tensor):  # pylint: disable=too-man
                     # move to next tile
                     tile_id[0] += CTA_COUNT
 
-    def _schedule():
-        sch = tir.Schedule(_func)
+    @T.prim_func(private=True)
+    def _func_gather(  # pylint: disable=too-many-statements
+        var_x: T.handle,
+        var_w: T.handle,
+        var_indptr: T.handle,
+        var_gather_indices: T.handle,
+        var_o: T.handle,
+    ):
+        T.func_attr({"tir.is_scheduled": 1, "tir.noalias": True})
+        B = T.int32(is_size_var=True)
+        B_src = T.int32(is_size_var=True)
+        X = T.match_buffer(var_x, (B_src, K), dtype)
+        W = T.match_buffer(var_w, (Ne, N, K), dtype)
+        indptr = T.match_buffer(var_indptr, (Ne + 1,), "int32")
+        G = T.match_buffer(var_gather_indices, (B,), "int32")
+        O = T.match_buffer(var_o, (B, N), dtype)
+
+        for _bx in T.thread_binding(CTA_COUNT, thread="blockIdx.x"):
+            with T.block("CTA"):
+                bx = T.axis.spatial(CTA_COUNT, _bx)
+                T.reads(indptr[:], G[:], X[:, :], W[:, :, :])
+                T.writes(O[:, :])
+                # pylint: disable=redefined-builtin
+                sum = T.alloc_buffer((2,), "int32", scope="local")
+                row = T.alloc_buffer((2,), "int32", scope="local")
+                cur_e = T.alloc_buffer((1,), "int32", scope="local")
+                tile_id = T.alloc_buffer((1,), "int32", scope="local")
+                # pylint: enable=redefined-builtin
+                sum[0] = 0
+                sum[1] = T.ceildiv(indptr[1] - indptr[0], BLK_M) * tiles_per_row
+                row[0] = 0
+                row[1] = indptr[1] - indptr[0]
+                cur_e[0] = 0
+                tile_id[0] = bx
+                while T.tvm_thread_invariant(cur_e[0] < Ne):  # pylint: disable=no-member
+                    # move to the current group
+                    while sum[1] <= tile_id[0] and cur_e[0] < Ne:
+                        cur_e[0] += 1
+                        if cur_e[0] < Ne:
+                            e: T.int32 = cur_e[0]
+                            delta: T.int32 = indptr[e + 1] - indptr[e]
+                            sum[0] = sum[1]
+                            sum[1] += T.ceildiv(delta, BLK_M) * tiles_per_row
+                            row[0] = row[1]
+                            row[1] += delta
+                    # sync threads to make sure all threads have the same tile position
+                    T.tvm_storage_sync("shared")
+                    if T.tvm_thread_invariant(cur_e[0] < Ne):  # pylint: disable=no-member
+                        # fetch current tile position
+                        e: T.int32 = cur_e[0]  # type: ignore[no-redef]
+                        num_tiles: T.int32 = tile_id[0] - sum[0]
+                        m_offset: T.int32 = BLK_M * T.floordiv(num_tiles, tiles_per_row) + row[0]
+                        n_offset: T.int32 = BLK_N * T.floormod(num_tiles, tiles_per_row)
+                        with T.block("gemm"):
+                            T.reads(
+                                row[1],
+                                G[m_offset : m_offset + BLK_M],
+                                X[:, :],
+                                W[e, n_offset : n_offset + BLK_N, :],
+                            )
+                            T.writes(O[m_offset : m_offset + BLK_M, n_offset : n_offset + BLK_N])
+                            X_tile = T.alloc_buffer((BLK_M, K), dtype, scope="shared")
+                            W_tile = T.alloc_buffer((BLK_N, K), dtype, scope="shared")
+                            O_tile = T.alloc_buffer((BLK_M, BLK_N), dtype, scope="local")
+                            for a0, a1 in T.grid(BLK_M, K):
+                                with T.block("X_shared"):
+                                    i, j = T.axis.remap("SS", [a0, a1])
+                                    # gather the token row on the fly while loading the tile
+                                    X_tile[i, j] = T.if_then_else(
+                                        m_offset + i < row[1],
+                                        X[G[m_offset + i], j],
+                                        zero,
+                                    )
+                            for a0, a1 in T.grid(BLK_N, K):
+                                with T.block("W_shared"):
+                                    i, j = T.axis.remap("SS", [a0, a1])
+                                    W_tile[i, j] = T.if_then_else(
+                                        n_offset + i < N,
+                                        W[e, n_offset + i, j],
+                                        zero,
+                                    )
+                            for a0, a1, a2 in T.grid(BLK_M, BLK_N, K):
+                                with T.block("compute"):
+                                    i, j, k = T.axis.remap("SSR", [a0, a1, a2])
+                                    with T.init():
+                                        O_tile[i, j] = zero
+                                    O_tile[i, j] += X_tile[i, k] * W_tile[j, k]
+                            for a0, a1 in T.grid(BLK_M, BLK_N):
+                                with T.block("store"):
+                                    i, j = T.axis.remap("SS", [a0, a1])
+                                    if m_offset + i < row[1] and n_offset + j < N:
+                                        O[m_offset + i, n_offset + j] = O_tile[i, j]
+                    # move to next tile
+                    tile_id[0] += CTA_COUNT
+
+    def _schedule(func):
+        sch = tir.Schedule(func)
 
         def _cooperative_fetch(block, vec_len):
             num_loops = len(sch.get_loops(block))
@@ -462,8 +576,16 @@ def group_gemm(x: Tensor, w: Tensor, indptr: Tensor):  # pylint: disable=too-man
         sch.decompose_reduction(main_block, ko)
         return sch.mod["main"]
 
+    if gather_indices is not None:
+        assert gather_indices.dtype == "int32"
+        return op.tensor_ir_op(
+            _schedule(_func_gather),
+            "group_gemm_gather",
+            args=[x, w, indptr, gather_indices],
+            out=Tensor.placeholder([gather_indices.shape[0], out_features], dtype),
+        )
     return op.tensor_ir_op(
-        _schedule(),
+        _schedule(_func),
         "group_gemm",
         args=[x, w, indptr],
         out=Tensor.placeholder([x.shape[0], out_features], dtype),
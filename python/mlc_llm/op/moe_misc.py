@@ -28,6 +28,40 @@ def moe_sum(x: Tensor, dim: int) -> Tensor:
     return op.sum(x, axis=dim)
 
 
+def moe_weighted_sum(x: Tensor, expert_weights: Tensor) -> Tensor:
+    """Combine the expert outputs of each token with their gating weights, applying the
+    weights inside the reduction accumulator. Compared with broadcasting the weights over a
+    [num_tokens, experts_per_tok, hidden_size] view and reducing it with `moe_sum`, no
+    weighted intermediate is ever written to memory.
+
+    Parameters
+    ----------
+    x : Tensor
+        The per-expert outputs in original token order, with shape
+        [num_tokens * experts_per_tok, hidden_size]: row `n * experts_per_tok + i` is the
+        output of the `i`-th selected expert for token `n`.
+
+    expert_weights : Tensor
+        The gating weights with shape [num_tokens, experts_per_tok].
+
+    Returns
+    -------
+    out : Tensor
+        The combined output with shape [num_tokens, hidden_size].
+    """
+    _, experts_per_tok = expert_weights.shape
+
+    def _weighted_sum(x: te.Tensor, w: te.Tensor):
+        r = te.reduce_axis((0, experts_per_tok), name="r")
+        return te.compute(
+            (w.shape[0], x.shape[1]),
+            lambda n, h: te.sum(x[n * experts_per_tok + r, h] * w[n, r], axis=r),
+            name="moe_weighted_sum",
+        )
+
+    return op.tensor_expr_op(_weighted_sum, "moe_weighted_sum", args=[x, expert_weights])
+
+
 def gating_softmax_topk(  # pylint: disable=too-many-statements
     x: Tensor, k: int, norm_topk_prob=True
 ) -> Tuple[Tensor, Tensor]:
@@ -176,6 +210,92 @@ def gating_softmax_topk(  # pylint: disable=too-many-statements
                             out[vi, vj] = local_top_k[vj]
                             out_index[vi, vj] = local_top_k_index[vj]
 
+    def _weight(local_top_k, local_max, local_sum, local_topk_sum, vj):
+        # Resolved at parse time: the top-k scores are softmaxed against the
+        # selected logits only (norm_topk_prob) or against the full row.
+        if norm_topk_prob:
+            return T.exp(local_top_k[vj] - local_top_k[0]) / local_topk_sum[0]
+        return T.exp(local_top_k[vj] - local_max[0]) / local_sum[0]
+
+    # generic fused kernel: one pass over the row maintains the sorted top-k
+    # in registers (insertion with swap) together with the online-softmax
+    # running max and denominator, so softmax/topk/normalize never touch DRAM
+    # with intermediate [batch_size, num_local_experts] tensors.
+    @T.prim_func(private=True)
+    def fused_topk_softmax_func(
+        var_x: T.handle,
+        var_out: T.handle,
+        var_out_index: T.handle,
+    ) -> None:
+        T.func_attr({"tir.noalias": True, "tir.is_scheduled": True})
+        batch_size = T.int64()
+        x = T.match_buffer(var_x, (batch_size, num_local_experts), dtype)
+        out = T.match_buffer(var_out, (batch_size, k), dtype)
+        out_index = T.match_buffer(var_out_index, (batch_size, k), index_dtype)
+        local_top_k = T.alloc_buffer((k,), dtype="float32", scope="local")
+        local_top_k_index = T.alloc_buffer((k,), dtype=index_dtype, scope="local")
+        local_cur = T.alloc_buffer((2,), dtype="float32", scope="local")
+        local_cur_index = T.alloc_buffer((2,), dtype=index_dtype, scope="local")
+        local_max = T.alloc_buffer((2,), dtype="float32", scope="local")
+        local_sum = T.alloc_buffer((1,), dtype="float32", scope="local")
+        local_topk_sum = T.alloc_buffer((1,), dtype="float32", scope="local")
+        for io in T.thread_binding(0, T.ceildiv(batch_size, TX), "blockIdx.x"):
+            for ii in T.thread_binding(0, TX, "threadIdx.x"):
+                with T.block("top_k"):
+                    vi = T.axis.spatial(batch_size, io * TX + ii)
+                    T.where(io * TX + ii < batch_size)
+                    for j in T.unroll(k):
+                        with T.block("init"):
+                            vj = T.axis.remap("S", [j])
+                            local_top_k[vj] = T.min_value("float32")
+                            local_top_k_index[vj] = 0
+                    with T.block("init_softmax"):
+                        local_max[0] = T.min_value("float32")
+                        local_sum[0] = T.float32(0)
+                    for e in range(num_local_experts):
+                        with T.block("update"):
+                            ve = T.axis.remap("S", [e])
+                            local_cur[0] = T.cast(x[vi, ve], "float32")
+                            local_cur_index[0] = ve
+                            local_max[1] = T.max(local_max[0], local_cur[0])
+                            local_sum[0] = local_sum[0] * T.exp(
+                                local_max[0] - local_max[1]
+                            ) + T.exp(local_cur[0] - local_max[1])
+                            local_max[0] = local_max[1]
+                            # Branchless compare-exchange: each slot keeps the larger of
+                            # (candidate, slot) and passes the smaller one down, so the
+                            # unrolled loop is straight-line select/min/max with no
+                            # data-dependent branches.
+                            for j in T.unroll(k):
+                                local_cur[1] = T.min(local_cur[0], local_top_k[j])
+                                local_cur_index[1] = T.Select(
+                                    local_cur[0] > local_top_k[j],
+                                    local_top_k_index[j],
+                                    local_cur_index[0],
+                                )
+                                local_top_k_index[j] = T.Select(
+                                    local_cur[0] > local_top_k[j],
+                                    local_cur_index[0],
+                                    local_top_k_index[j],
+                                )
+                                local_top_k[j] = T.max(local_cur[0], local_top_k[j])
+                                local_cur[0] = local_cur[1]
+                                local_cur_index[0] = local_cur_index[1]
+                    with T.block("init_topk_sum"):
+                        local_topk_sum[0] = T.float32(0)
+                    for j in T.unroll(k):
+                        with T.block("topk_sum"):
+                            vj = T.axis.remap("S", [j])
+                            local_topk_sum[0] += T.exp(local_top_k[vj] - local_top_k[0])
+                    for j in T.unroll(k):
+                        with T.block("output"):
+                            vj = T.axis.remap("S", [j])
+                            out[vi, vj] = T.cast(
+                                _weight(local_top_k, local_max, local_sum, local_topk_sum, vj),
+                                dtype,
+                            )
+                            out_index[vi, vj] = local_top_k_index[vj]
+
     # fast path for Mixtral
     if k == 2 and norm_topk_prob:
         return op.tensor_ir_op(
@@ -198,18 +318,15 @@ def gating_softmax_topk(  # pylint: disable=too-many-statements
                 Tensor.placeholder([batch_size, 4], index_dtype),
             ),
         )
-    if norm_topk_prob:
-        # Compute topk first and then softmax to avoid extra re-normalize
-        expert_score, expert_indices = op.topk(
-            x, k, axis=-1, ret_type="both", largest=True, dtype=index_dtype
-        )
-        expert_score = op.softmax(expert_score.astype("float32"), axis=-1).astype(dtype)
-    else:
-        expert_score = op.softmax(x.astype("float32"), axis=-1).astype(dtype)
-        expert_score, expert_indices = op.topk(
-            expert_score, k, axis=-1, ret_type="both", largest=True, dtype=index_dtype
-        )
-    return expert_score, expert_indices
+    return op.tensor_ir_op(
+        fused_topk_softmax_func,
+        f"top{k}_softmax_fused",
+        args=[x],
+        out=(
+            Tensor.placeholder([batch_size, k], dtype),
+            Tensor.placeholder([batch_size, k], index_dtype),
+        ),
+    )
 
 
 def moe_cumsum(expert_indices: Tensor, num_local_experts: int) -> Tensor: